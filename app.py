@@ -1,15 +1,22 @@
 # app.py
 # -*- coding: utf-8 -*-
 
+import hashlib
 import os
-from typing import Optional, Dict, Any, Tuple
+import re
+from typing import Optional, Dict, Any, List, Tuple
 
-import pandas as pd
 import streamlit as st
-from sqlalchemy import create_engine, text
-from sqlalchemy.engine import Engine
+import streamlit.components.v1 as components
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Connection, Engine
 from sqlalchemy.exc import SQLAlchemyError
 
+from consultas import (
+    Q_ANTERIOR, Q_CONTAR, Q_IMAGENS, Q_LISTAR, Q_LOAD, Q_PROXIMA, Q_RESUMO,
+    Q_SALTO, Q_UPSERT, filtro,
+)
+
 # --- import seguro do dotenv (tolerante se o pacote não estiver instalado) ---
 try:
     from dotenv import load_dotenv
@@ -17,6 +24,19 @@ except Exception:
     def load_dotenv(*args, **kwargs):
         return False
 
+# --- boto3 opcional: URLs pré-assinadas do S3 para imagens guardadas como chave ---
+try:
+    import boto3
+except Exception:
+    boto3 = None
+
+# --- driver MySQL: mysqlclient (extensão C) se instalado; senão PyMySQL (puro Python) ---
+try:
+    import MySQLdb  # noqa: F401
+    MYSQL_DRIVER = "mysqldb"
+except Exception:
+    MYSQL_DRIVER = "pymysql"
+
 # ==============================
 # Configuração de página e estilo
 # ==============================
@@ -59,60 +79,27 @@ header[data-testid="stHeader"] { backdrop-filter: blur(6px); }
 textarea {
   font-family: ui-monospace, SFMono-Regular, Menlo, Monaco, Consolas, "Liberation Mono", monospace;
 }
-
-/* Componente de zoom por clique */
-.cz-wrap {
-  position: relative;
-  width: 100%;
-  overflow: hidden;
-  border-radius: 12px;
-  border: 1px solid #E2E8F0;
-  background: #fff;
-  user-select: none;
-}
-.cz-img {
-  display: block;
-  width: 100%;
-  height: 100%;
-  object-fit: contain;              /* imagem completa no estado inicial */
-  transform-origin: var(--cx, 50%) var(--cy, 50%);
-  transition: transform 120ms ease, translate 120ms ease, cursor 120ms ease;
-  cursor: zoom-in;
-}
-.cz-hint {
-  position: absolute;
-  right: 10px; bottom: 10px;
-  background: rgba(15,23,42,.75);
-  color: #fff;
-  padding: 6px 10px;
-  border-radius: 999px;
-  font-size: 12px;
-  z-index: 3;
-}
-.cz-controls {
-  position: absolute;
-  left: 10px; bottom: 10px;
-  display: flex; gap: 6px;
-  z-index: 4;
-}
-.cz-btn {
-  background: rgba(255,255,255,.95);
-  border: 1px solid #CBD5E1;
-  border-radius: 8px;
-  padding: 4px 10px;
-  font-weight: 700;
-  font-size: 14px;
-  box-shadow: 0 1px 2px rgba(0,0,0,.06);
-  cursor: pointer;
-}
-.cz-btn:active { transform: translateY(1px); }
 </style>
 """
-st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
+# O CSS precisa ser reenviado em todo rerun completo (elementos não emitidos
+# são removidos da página), então só reduzimos o payload: minificado uma vez
+# por processo. Reruns de fragmento (editor) não o reenviam.
+@st.cache_resource(show_spinner=False)
+def _css_minificado() -> str:
+    return re.sub(r"\s+", " ", re.sub(r"/\*.*?\*/", "", CUSTOM_CSS, flags=re.S)).strip()
+
+st.markdown(_css_minificado(), unsafe_allow_html=True)
 
 # ==============================
 # Utilidades
 # ==============================
+PAGE_SIZE_OPCOES = [50, 100, 200, 500]
+PAGE_SIZE_PADRAO = 200
+
+# Sufixos dos rótulos do seletor (pré-formatados)
+LABEL_PENDENTE = "  —  Não atualizado"
+LABEL_ATUALIZADO = "  —  Atualizado"
+
 def _clean_env(s: Optional[str]) -> str:
     if s is None:
         return ""
@@ -123,15 +110,17 @@ def _clean_env(s: Optional[str]) -> str:
         s = s[1:-1]
     return s
 
+def _digest(s: str) -> bytes:
+    """Resumo (16 bytes) do texto: guarda-se só isto do último texto salvo, não uma 2ª cópia."""
+    return hashlib.blake2b(s.encode("utf-8"), digest_size=16).digest()
+
 def _safe_image_url(raw: Optional[str]) -> Optional[str]:
     if not raw:
         return None
     if raw.startswith("http://") or raw.startswith("https://"):
         return raw
-    # Se preferir, defina um prefixo do seu bucket:
-    # base = "https://seu-bucket.s3.sa-east-1.amazonaws.com/"
-    # return base + raw.lstrip("/")
-    return raw
+    # Chave do S3: URL pré-assinada (com Cache-Control) se S3_BUCKET estiver configurado
+    return _presigned_url(raw.lstrip("/")) or raw
 
 # ==============================
 # Engine: st.secrets → .env → os.environ
@@ -169,13 +158,67 @@ def build_engine() -> Engine:
             "DB_HOST, DB_DATABASE, DB_USERNAME, DB_PASSWORD."
         )
 
-    url = f"mysql+pymysql://{user}:{pw}@{host}:{port}/{db}?charset=utf8mb4"
+    url = f"mysql+{MYSQL_DRIVER}://{user}:{pw}@{host}:{port}/{db}?charset=utf8mb4"
     return create_engine(url, pool_pre_ping=True, pool_recycle=1800)
 
+# ==============================
+# S3 (opcional): st.secrets["s3"] → .env → os.environ
+# ==============================
+S3_URL_EXPIRES = 3600              # validade da URL pré-assinada (s)
+S3_CACHE_CONTROL = "public, max-age=86400"
+
+@st.cache_resource(show_spinner=False)
+def _s3_client() -> Optional[Tuple[Any, str]]:
+    """(cliente, bucket) ou None se boto3/S3_BUCKET não estiverem disponíveis."""
+    if boto3 is None:
+        return None
+    secrets_s3 = {}
+    try:
+        secrets_s3 = st.secrets.get("s3", st.secrets)
+    except Exception:
+        secrets_s3 = {}
+
+    def _get(name: str, default: str = "") -> str:
+        if name in secrets_s3:
+            return str(secrets_s3.get(name, default))
+        return os.getenv(name, default)
+
+    load_dotenv()
+    bucket = _clean_env(_get("S3_BUCKET", ""))
+    if not bucket:
+        return None
+    region = _clean_env(_get("S3_REGION", "")) or None
+    return boto3.client("s3", region_name=region), bucket
+
+# ttl menor que a validade: a URL servida tem sempre >= 30 min de vida, e fica
+# estável nesse intervalo (mesma URL → cache HTTP do navegador reaproveita).
+@st.cache_data(ttl=S3_URL_EXPIRES // 2, max_entries=1024, show_spinner=False)
+def _presigned_url(key: str) -> Optional[str]:
+    s3 = _s3_client()
+    if s3 is None:
+        return None
+    client, bucket = s3
+    try:
+        return client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": bucket, "Key": key, "ResponseCacheControl": S3_CACHE_CONTROL},
+            ExpiresIn=S3_URL_EXPIRES,
+        )
+    except Exception:
+        return None
+
 # ==============================
 # Zoom por clique (com wheel) + anti-click pós-pan
 # ==============================
-def render_click_zoom(image_url: str, height_px: int = 760, step: float = 0.5, max_scale: float = 4.0, min_scale: float = 1.0):
+# Template estático (components/click_zoom/index.html) servido pelo Streamlit:
+# o navegador faz cache do HTML/JS e, entre reruns, só recebe os args novos.
+_click_zoom_component = components.declare_component(
+    "click_zoom",
+    path=os.path.join(os.path.dirname(os.path.abspath(__file__)), "components", "click_zoom"),
+)
+
+def render_click_zoom(image_url: str, height_px: int = 760, step: float = 0.5, max_scale: float = 4.0, min_scale: float = 1.0,
+                      preload: Optional[List[str]] = None):
     """
     - Clique normal: aumenta zoom.
     - Shift + clique: diminui zoom.
@@ -184,265 +227,140 @@ def render_click_zoom(image_url: str, height_px: int = 760, step: float = 0.5, m
     - Arraste (mouse/touch): move quando ampliada.
     - Anti-zoom após pan: ignora o 'click' que vem logo depois de arrastar.
     - Mantém o comportamento visual original (imagem aparece inteira).
+
+    A chave fixa mantém o mesmo iframe entre reruns; trocar de redação só
+    atualiza o src da imagem (sem recarregar nem reinterpretar o script).
+    `preload`: URLs baixadas em segundo plano (ociosidade) para aquecer o cache HTTP.
     """
-    from streamlit.components.v1 import html
-
-    html(f"""
-    <style>
-      .cz-wrap {{
-        position: relative;
-        width: 100%;
-        height: {height_px}px;            /* altura visível do contêiner */
-        overflow: hidden;
-        border-radius: 12px;
-        border: 1px solid #E2E8F0;
-        background: #fff;
-        user-select: none;
-      }}
-      .cz-img {{
-        display: block;
-        width: 100%;
-        height: 100%;
-        object-fit: contain;              /* garante imagem inteira no estado inicial */
-        transform-origin: var(--cx, 50%) var(--cy, 50%);
-        transition: transform 120ms ease, translate 120ms ease, cursor 120ms ease;
-        cursor: zoom-in;
-      }}
-    </style>
-
-    <div class="cz-wrap" id="cz-wrap">
-      <img id="cz-img" class="cz-img" src="{image_url}" alt="Redação" />
-    </div>
-
-    <script>
-    (function(){{
-      const img = document.getElementById('cz-img');
-      const wrap = document.getElementById('cz-wrap');
-
-      let scale = {min_scale};           // 1.0 (tamanho normal)
-      const step = {step};
-      const maxScale = {max_scale};
-      const minScale = {min_scale};
-
-      let posX = 0, posY = 0;            // translate em px
-      let isPanning = false;
-      let startX = 0, startY = 0;
-
-      // ---- flags anti-click pós-pan ----
-      const DRAG_THRESHOLD = 5;          // px de deslocamento para considerar "pan"
-      let downX = 0, downY = 0;
-      let movedSinceDown = false;
-      let ignoreNextClick = false;
-
-      function clamp(v, lo, hi) {{
-        return Math.max(lo, Math.min(hi, v));
-      }}
-
-      function applyTransform() {{
-        img.style.transform = 'scale(' + scale + ') translate(' + posX + 'px, ' + posY + 'px)';
-        img.style.cursor = scale > 1 ? (isPanning ? 'grabbing' : 'grab') : 'zoom-in';
-      }}
-
-      function setOriginFromEvent(e) {{
-        const rect = img.getBoundingClientRect();
-        const clientX = e.clientX || (e.touches && e.touches[0].clientX);
-        const clientY = e.clientY || (e.touches && e.touches[0].clientY);
-        if (clientX == null || clientY == null) return;
-        const x = (clientX - rect.left) / rect.width * 100;
-        const y = (clientY - rect.top)  / rect.height * 100;
-        img.style.setProperty('--cx', x + '%');
-        img.style.setProperty('--cy', y + '%');
-      }}
-
-      function zoomBy(delta, e) {{
-        const prev = scale;
-        scale = clamp(parseFloat((scale + delta).toFixed(2)), minScale, maxScale);
-        if (prev !== scale && e) setOriginFromEvent(e);
-        if (scale === minScale) {{ posX = 0; posY = 0; }}
-        applyTransform();
-      }}
-
-      // Clique: +zoom | Shift+clique: -zoom (com antirruído pós-pan)
-      wrap.addEventListener('click', (e) => {{
-        if (ignoreNextClick) {{ ignoreNextClick = false; return; }}  // suprime click após pan
-        if (e.detail > 1) return;  // evita duplicar com dblclick
-        if (typeof e.button === 'number' && e.button !== 0) return; // só botão esquerdo
-        zoomBy(e.shiftKey ? -step : step, e);
-      }});
-
-      // Roda do mouse: ± zoom (para frente +, para trás -)
-      wrap.addEventListener('wheel', (e) => {{
-        e.preventDefault();
-        const delta = e.deltaY < 0 ? step : -step;
-        zoomBy(delta, e);
-      }}, {{passive:false}});
-
-      // Duplo clique: reset
-      wrap.addEventListener('dblclick', () => {{
-        scale = minScale; posX = 0; posY = 0; applyTransform();
-      }});
-
-      // Pan com mouse
-      wrap.addEventListener('mousedown', (e) => {{
-        if (typeof e.button === 'number' && e.button !== 0) return; // só botão esquerdo
-        if (scale <= minScale) return;    // só pan quando ampliada
-        isPanning = true;
-        movedSinceDown = false;
-        downX = e.clientX; downY = e.clientY;
-        startX = e.clientX - posX;
-        startY = e.clientY - posY;
-        img.style.cursor = 'grabbing';
-        e.preventDefault();
-      }});
-
-      window.addEventListener('mousemove', (e) => {{
-        if (!isPanning) return;
-        posX = e.clientX - startX;
-        posY = e.clientY - startY;
-
-        // marca como "moveu" se passou do limiar
-        if (!movedSinceDown) {{
-          if (Math.abs(e.clientX - downX) > DRAG_THRESHOLD || Math.abs(e.clientY - downY) > DRAG_THRESHOLD) {{
-            movedSinceDown = true;
-          }}
-        }}
-        applyTransform();
-      }});
-
-      window.addEventListener('mouseup', () => {{
-        if (!isPanning) return;
-        isPanning = false;
-        if (movedSinceDown) {{
-          // Se houve pan real, ignore o click que o navegador dispara depois do mouseup
-          ignoreNextClick = true;
-          setTimeout(() => {{ ignoreNextClick = false; }}, 250);
-        }}
-        if (scale > minScale) img.style.cursor = 'grab';
-      }});
-
-      // Touch (mobile) – arrastar
-      wrap.addEventListener('touchstart', (e) => {{
-        if (scale <= minScale) return;
-        const t = e.touches[0];
-        isPanning = true;
-        movedSinceDown = false;
-        downX = t.clientX; downY = t.clientY;
-        startX = t.clientX - posX;
-        startY = t.clientY - posY;
-      }}, {{passive:true}});
-
-      wrap.addEventListener('touchmove', (e) => {{
-        if (!isPanning) return;
-        const t = e.touches[0];
-        posX = t.clientX - startX;
-        posY = t.clientY - startY;
-
-        if (!movedSinceDown) {{
-          if (Math.abs(t.clientX - downX) > DRAG_THRESHOLD || Math.abs(t.clientY - downY) > DRAG_THRESHOLD) {{
-            movedSinceDown = true;
-          }}
-        }}
-        applyTransform();
-      }}, {{passive:true}});
-
-      wrap.addEventListener('touchend', () => {{
-        if (!isPanning) return;
-        isPanning = false;
-        if (movedSinceDown) {{
-          ignoreNextClick = true;
-          setTimeout(() => {{ ignoreNextClick = false; }}, 250);
-        }}
-      }});
-
-      // Inicial
-      applyTransform();
-    }})();
-    </script>
-    """, height=height_px+6, scrolling=False)
+    _click_zoom_component(
+        image_url=image_url,
+        height_px=height_px,
+        step=step,
+        max_scale=max_scale,
+        min_scale=min_scale,
+        preload=list(preload or []),
+        key="click_zoom",
+        default=None,
+    )
 
 # ==============================
 # Acesso ao banco (tudo em textos_digitados)
 # ==============================
-def get_resumo(engine: Engine) -> Tuple[int, int, int]:
-    q = text("""
-        SELECT
-          COUNT(*) AS total,
-          SUM(CASE WHEN COALESCE(status,0)=0 THEN 1 ELSE 0 END) AS pendentes,
-          SUM(CASE WHEN COALESCE(status,0)=1 THEN 1 ELSE 0 END) AS concluidos
-        FROM textos_digitados
-    """)
-    with engine.connect() as c:
-        r = c.execute(q).mappings().first()
-        total = int(r["total"] or 0)
-        pend = int(r["pendentes"] or 0)
-        conc = int(r["concluidos"] or 0)
-        return total, pend, conc
-
-def listar_redacoes(engine: Engine, somente_pendentes: bool, busca: str) -> pd.DataFrame:
-    base_sql = """
-        SELECT
-          redacao_id,
-          arquivo_nome_armazenamento AS imagem_url,
-          COALESCE(status,0) AS status,
-          COALESCE(texto_digitado,'') AS texto_digitado
-        FROM textos_digitados
+# SQL em consultas.py (compilado uma vez por processo).
+def get_resumo(conn: Connection) -> Tuple[int, int, int]:
+    por_status: Dict[int, int] = {}
+    for status, n in conn.execute(Q_RESUMO).all():
+        # sem migrations/001 ainda aplicada, status NULL vem num grupo próprio: conta como 0
+        chave = int(status or 0)
+        por_status[chave] = por_status.get(chave, 0) + int(n)
+    total = sum(por_status.values())
+    return total, por_status.get(0, 0), por_status.get(1, 0)
+
+def contar_redacoes(conn: Connection, somente_pendentes: bool, busca: str) -> int:
+    variante, params = filtro(somente_pendentes, busca)
+    return int(conn.execute(Q_CONTAR[variante], params).scalar() or 0)
+
+def listar_redacoes(
+    conn: Connection, somente_pendentes: bool, busca: str, after_id: Optional[int] = None, limit: int = 200
+) -> Tuple[List[Tuple[int, int]], bool]:
+    """
+    Lista uma janela (redacao_id + status) a partir de after_id, por keyset —
+    o necessário para o seletor. Imagem e texto são buscados só em carregar_redacao.
+    Retorna (linhas, tem_mais): busca limit+1 linhas para saber se há próxima janela.
+    """
+    variante, params = filtro(somente_pendentes, busca)
+    params["lim"] = int(limit) + 1
+    if after_id is not None:
+        params["after"] = int(after_id)
+    rows = conn.execute(Q_LISTAR[variante + (after_id is not None,)], params).fetchall()
+    linhas = [(int(r[0]), int(r[1] or 0)) for r in rows[:limit]]  # status NULL = pendente
+    return linhas, len(rows) > limit
+
+def redacao_vizinha(
+    conn: Connection, somente_pendentes: bool, busca: str, redacao_id: int, proxima: bool = True, salto: int = 0
+) -> Optional[int]:
+    """
+    Próximo/anterior redacao_id fora da janela atual, via keyset
+    (redacao_id > :rid), que usa a PK em vez de varrer um OFFSET.
+    Com salto=n devolve o (n+1)-ésimo vizinho (limite da janela anterior).
+    """
+    variante, params = filtro(somente_pendentes, busca)
+    params.update(rid=int(redacao_id), off=int(salto))
+    q = (Q_PROXIMA if proxima else Q_ANTERIOR)[variante]
+    r = conn.execute(q, params).first()
+    return int(r[0]) if r else None
+
+def after_da_pagina(conn: Connection, somente_pendentes: bool, busca: str, pagina: int, page_size: int) -> Optional[int]:
+    """after_id que inicia a página informada (None = 1ª página). Usado só no salto direto."""
+    if pagina <= 1:
+        return None
+    variante, params = filtro(somente_pendentes, busca)
+    params["off"] = (int(pagina) - 1) * int(page_size) - 1
+    r = conn.execute(Q_SALTO[variante], params).first()
+    return int(r[0]) if r else None
+
+def _redacao_dict(r) -> Dict[str, Any]:
+    # acesso posicional (ordem das colunas de Q_LOAD): sem RowMapping por linha
+    rid, imagem_url, status, texto = r
+    return {
+        "redacao_id": int(rid),
+        "imagem_url": _safe_image_url(imagem_url),
+        "status": int(status or 0),
+        "texto_digitado": texto or "",
+    }
+
+def carregar_redacao(conn: Connection, redacao_id: int) -> Dict[str, Any]:
+    """Lê sempre do banco: outro revisor pode ter salvo a redação desde a última leitura."""
+    r = conn.execute(Q_LOAD, {"rid": redacao_id}).first()
+    if not r:
+        raise ValueError(f"redacao_id {redacao_id} não encontrado em textos_digitados.")
+    return _redacao_dict(r)
+
+def carregar_imagens(conn: Connection, redacao_ids: List[int]) -> None:
     """
-    where = []
-    params = {}
-    if somente_pendentes:
-        where.append("COALESCE(status,0) = 0")
-    if busca:
-        where.append("CAST(redacao_id AS CHAR) LIKE :busca")
-        params["busca"] = f"%{busca}%"
-
-    if where:
-        base_sql += " WHERE " + " AND ".join(where)
-    base_sql += " ORDER BY redacao_id ASC"
-
-    with engine.connect() as c:
-        df = pd.read_sql(text(base_sql), c, params=params)
-    df["imagem_url"] = df["imagem_url"].apply(_safe_image_url)
-    return df
-
-def carregar_redacao(engine: Engine, redacao_id: int) -> Dict[str, Any]:
-    q = text("""
-        SELECT
-          redacao_id,
-          arquivo_nome_armazenamento AS imagem_url,
-          COALESCE(status,0) AS status,
-          COALESCE(texto_digitado,'') AS texto_digitado
-        FROM textos_digitados
-        WHERE redacao_id = :rid
-        LIMIT 1
-    """)
-    with engine.connect() as c:
-        r = c.execute(q, {"rid": redacao_id}).mappings().first()
-        if not r:
-            raise ValueError(f"redacao_id {redacao_id} não encontrado em textos_digitados.")
-        return {
-            "redacao_id": int(r["redacao_id"]),
-            "imagem_url": _safe_image_url(r["imagem_url"]),
-            "status": int(r["status"] or 0),
-            "texto_digitado": r["texto_digitado"] or "",
-        }
+    Mantém em st.session_state.imagens_cache o caminho da imagem da selecionada
+    e das vizinhas (anterior/próxima), buscando as que faltam em um único IN (...).
+    Serve só ao pré-carregamento; texto/status vêm sempre de carregar_redacao.
+    """
+    cache = st.session_state.imagens_cache
+    faltantes = [rid for rid in redacao_ids if rid not in cache]
+    if faltantes:
+        for rid, imagem_url in conn.execute(Q_IMAGENS, {"rids": faltantes}).all():
+            cache[int(rid)] = imagem_url
+    st.session_state.imagens_cache = {rid: cache[rid] for rid in redacao_ids if rid in cache}
 
 def salvar_texto(engine: Engine, redacao_id: int, novo_texto: str, imagem_url: Optional[str]) -> None:
     """
     Atualiza textos_digitados (status=1). Se não existir, insere com a imagem informada.
     """
-    upd = text("""
-        UPDATE textos_digitados
-           SET texto_digitado = :txt, status = 1
-         WHERE redacao_id = :rid
-    """)
-    ins = text("""
-        INSERT INTO textos_digitados (redacao_id, texto_digitado, status, arquivo_nome_armazenamento)
-        VALUES (:rid, :txt, 1, :img)
-    """)
     with engine.begin() as c:
-        res = c.execute(upd, {"txt": novo_texto, "rid": redacao_id})
-        if res.rowcount == 0:
-            c.execute(ins, {"rid": redacao_id, "txt": novo_texto, "img": imagem_url or ""})
+        c.execute(Q_UPSERT, {"rid": redacao_id, "txt": novo_texto, "img": imagem_url or ""})
+    # invalida as consultas cacheadas que dependem de status (para todas as sessões)
+    _get_resumo_cached.clear()
+    _contar_redacoes_cached.clear()
+    _listar_redacoes_cached.clear()
+
+# ==============================
+# Cache das consultas (lista/resumo)
+# ==============================
+# Chave = filtros; salvar_texto limpa estes caches após o commit, então a
+# consulta só roda quando filtros/dados mudam (ttl cobre escritas externas).
+@st.cache_data(ttl=60, show_spinner=False)
+def _get_resumo_cached() -> Tuple[int, int, int]:
+    with build_engine().connect() as conn:
+        return get_resumo(conn)
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _contar_redacoes_cached(somente_pendentes: bool, busca: str) -> int:
+    with build_engine().connect() as conn:
+        return contar_redacoes(conn, somente_pendentes, busca)
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _listar_redacoes_cached(
+    somente_pendentes: bool, busca: str, after_id: Optional[int], limit: int
+) -> Tuple[List[Tuple[int, int]], bool]:
+    with build_engine().connect() as conn:
+        return listar_redacoes(conn, somente_pendentes, busca, after_id, limit)
 
 # ==============================
 # Estado de sessão
@@ -451,10 +369,25 @@ if "selecionado" not in st.session_state:
     st.session_state.selecionado = None
 if "loaded_redacao_id" not in st.session_state:
     st.session_state.loaded_redacao_id = None
-if "last_saved_text" not in st.session_state:
-    st.session_state.last_saved_text = ""
+if "last_saved_hash" not in st.session_state:
+    st.session_state.last_saved_hash = _digest("")
 if "texto_digitado_input" not in st.session_state:
     st.session_state.texto_digitado_input = ""
+if "char_count" not in st.session_state:
+    st.session_state.char_count = 0
+    st.session_state.line_count = 1
+if "show_count" not in st.session_state:
+    st.session_state.show_count = False
+if "pagina" not in st.session_state:
+    st.session_state.pagina = 1
+if "page_after_id" not in st.session_state:
+    st.session_state.page_after_id = None  # início (exclusivo) da janela listada
+if "redacao_atual" not in st.session_state:
+    st.session_state.redacao_atual = None  # dados da selecionada, lidos quando a seleção muda
+if "imagens_cache" not in st.session_state:
+    st.session_state.imagens_cache = {}  # redacao_id -> caminho da imagem (selecionada ± 1)
+if "filtros" not in st.session_state:
+    st.session_state.filtros = None
 
 # ==============================
 # Inicialização / conexão
@@ -467,7 +400,7 @@ except Exception as e:
     st.stop()
 
 try:
-    total, pendentes, concluidos = get_resumo(engine)
+    total, pendentes, concluidos = _get_resumo_cached()
 except SQLAlchemyError as e:
     st.error("Erro ao consultar o resumo.")
     st.exception(e)
@@ -476,14 +409,24 @@ except SQLAlchemyError as e:
 # ==============================
 # Resumo – cards
 # ==============================
-col_a, col_b, col_c = st.columns(3)
-with col_a:
-    st.markdown(f'</br><div class="stat-card"><div class="stat-value">{total}</div><div class="stat-label">Total</div></div>', unsafe_allow_html=True)
-with col_b:
-    st.markdown(f'</br><div class="stat-card"><div class="stat-value">{pendentes}</div><div class="stat-label">Não atualizadas</div></div>', unsafe_allow_html=True)
-with col_c:
-    st.markdown(f'</br><div class="stat-card"><div class="stat-value">{concluidos}</div><div class="stat-label">Atualizadas</div></div>', unsafe_allow_html=True)
-
+# Os cards ficam num placeholder, desenhado aqui e redesenhado pelo editor
+# (fragmento): ao salvar, os contadores andam por delta em session_state, sem nova consulta.
+st.session_state.resumo = {"total": total, "pendentes": pendentes, "concluidos": concluidos}
+resumo_ph = st.empty()
+
+def render_resumo() -> None:
+    r = st.session_state.resumo
+    with resumo_ph.container():
+        col_a, col_b, col_c = st.columns(3)
+        with col_a:
+            st.markdown(f'</br><div class="stat-card"><div class="stat-value">{r["total"]}</div><div class="stat-label">Total</div></div>', unsafe_allow_html=True)
+        with col_b:
+            st.markdown(f'</br><div class="stat-card"><div class="stat-value">{r["pendentes"]}</div><div class="stat-label">Não atualizadas</div></div>', unsafe_allow_html=True)
+        with col_c:
+            st.markdown(f'</br><div class="stat-card"><div class="stat-value">{r["concluidos"]}</div><div class="stat-label">Atualizadas</div></div>', unsafe_allow_html=True)
+
+render_resumo()
+st.session_state.resumo_no_corpo = True
 st.write("")
 
 # ==============================
@@ -493,18 +436,67 @@ st.sidebar.markdown("### Filtros")
 somente_pendentes = st.sidebar.toggle("Mostrar apenas 'Não atualizadas'", value=True)
 busca = st.sidebar.text_input("Buscar por redacao_id", placeholder="Ex.: 12345")
 
+# Sem busca, o total filtrado é o próprio resumo (total/pendentes): evita um
+# segundo agregado sobre a tabela. O COUNT só roda quando há termo de busca.
+if not busca:
+    total_filtrado = pendentes if somente_pendentes else total
+else:
+    try:
+        total_filtrado = _contar_redacoes_cached(somente_pendentes, busca)
+    except SQLAlchemyError as e:
+        st.error("Erro ao contar redações.")
+        st.exception(e)
+        st.stop()
+
+if total_filtrado == 0:
+    st.sidebar.info("Nenhuma redação encontrada com os filtros atuais.")
+    st.info("Ajuste os filtros na barra lateral para exibir redações.")
+    st.stop()
+
+page_size = st.sidebar.selectbox(
+    "Itens por página",
+    options=PAGE_SIZE_OPCOES,
+    index=PAGE_SIZE_OPCOES.index(PAGE_SIZE_PADRAO),
+)
+n_paginas = (total_filtrado + page_size - 1) // page_size
+
+# Volta à 1ª página quando filtros/tamanho de página mudam
+filtros_atuais = (somente_pendentes, busca, page_size)
+if st.session_state.filtros != filtros_atuais:
+    st.session_state.filtros = filtros_atuais
+    st.session_state.pagina = 1
+    st.session_state.page_after_id = None
+# A numeração é aproximada (salvar com o filtro de pendentes desloca as posições);
+# o que define a janela é page_after_id.
+st.session_state.pagina = min(max(1, st.session_state.pagina), n_paginas)
+
+pagina = st.sidebar.number_input(
+    "Página", min_value=1, max_value=n_paginas, value=st.session_state.pagina, step=1
+)
 try:
-    df_lista = listar_redacoes(engine, somente_pendentes, busca)
+    if pagina != st.session_state.pagina:
+        st.session_state.pagina = int(pagina)
+        with engine.connect() as conn:
+            st.session_state.page_after_id = after_da_pagina(conn, somente_pendentes, busca, int(pagina), page_size)
+    lista, tem_mais = _listar_redacoes_cached(
+        somente_pendentes, busca, st.session_state.page_after_id, page_size
+    )
 except SQLAlchemyError as e:
     st.error("Erro ao listar redações.")
     st.exception(e)
     st.stop()
 
-ids = df_lista["redacao_id"].tolist()
-labels_map = {
-    int(rid): f"{int(rid)}  —  {'Não atualizado' if int(status) == 0 else 'Atualizado'}"
-    for rid, status in zip(df_lista["redacao_id"], df_lista["status"])
-}
+# Janela vazia (ex.: as redações depois de page_after_id foram concluídas): volta ao início
+if not lista and st.session_state.page_after_id is not None:
+    st.session_state.pagina = 1
+    st.session_state.page_after_id = None
+    st.rerun()
+
+ids = []
+labels_map = {}
+for rid, status in lista:
+    ids.append(rid)
+    labels_map[rid] = f"{rid}{LABEL_PENDENTE if status == 0 else LABEL_ATUALIZADO}"
 
 if not ids:
     st.sidebar.info("Nenhuma redação encontrada com os filtros atuais.")
@@ -526,24 +518,48 @@ if selecionado_id != st.session_state.selecionado:
     st.session_state.selecionado = selecionado_id
     st.session_state.loaded_redacao_id = None
 
+def ir_para_vizinha(proxima: bool) -> None:
+    """
+    Seleciona a redação seguinte/anterior. Dentro da janela usa `ids`;
+    na borda, busca o vizinho por keyset e desloca a janela.
+    """
+    atual = st.session_state.selecionado
+    idx = ids.index(atual) + (1 if proxima else -1)
+    if 0 <= idx < len(ids):
+        alvo = ids[idx]
+    else:
+        with engine.connect() as conn:
+            alvo = redacao_vizinha(conn, somente_pendentes, busca, atual, proxima)
+            if alvo is None:
+                return
+            if proxima:
+                st.session_state.page_after_id = ids[-1]
+                st.session_state.pagina += 1
+            else:
+                st.session_state.page_after_id = redacao_vizinha(
+                    conn, somente_pendentes, busca, ids[0], proxima=False, salto=page_size
+                )
+                st.session_state.pagina = max(1, st.session_state.pagina - 1)
+    st.session_state.selecionado = alvo
+    st.session_state.loaded_redacao_id = None
+
 # Navegação rápida
 st.sidebar.markdown("### Navegação rápida")
 idx_atual = ids.index(st.session_state.selecionado)
-disabled_prev = idx_atual <= 0
-disabled_next = idx_atual >= len(ids) - 1
+disabled_prev = idx_atual <= 0 and st.session_state.page_after_id is None
+disabled_next = idx_atual >= len(ids) - 1 and not tem_mais
 
 col_prev, col_next = st.sidebar.columns(2)
 with col_prev:
     if st.button("⟵ Anterior", use_container_width=True, disabled=disabled_prev):
-        st.session_state.selecionado = ids[idx_atual - 1]
-        st.session_state.loaded_redacao_id = None
+        ir_para_vizinha(proxima=False)
         st.rerun()
 with col_next:
     if st.button("Próximo ⟶", use_container_width=True, disabled=disabled_next):
-        st.session_state.selecionado = ids[idx_atual + 1]
-        st.session_state.loaded_redacao_id = None
+        ir_para_vizinha(proxima=True)
         st.rerun()
 
+st.sidebar.caption(f"Página {st.session_state.pagina} de {n_paginas} • {total_filtrado} redações")
 st.sidebar.caption("Dica: foque nas 'Não atualizadas' para acelerar a revisão.")
 
 st.write("")
@@ -564,17 +580,29 @@ st.write("")
 
 # Carrega dados da redação selecionada
 try:
-    dados = carregar_redacao(engine, st.session_state.selecionado)
+    # A selecionada é relida sempre que a seleção muda (texto/status atuais);
+    # reruns sem troca de seleção reaproveitam a leitura.
+    if st.session_state.loaded_redacao_id != st.session_state.selecionado:
+        with engine.connect() as conn:
+            st.session_state.redacao_atual = carregar_redacao(conn, st.session_state.selecionado)
+    dados = st.session_state.redacao_atual
 except Exception as e:
     st.error("Não foi possível carregar a redação selecionada.")
     st.exception(e)
     st.stop()
 
+def atualizar_contagem() -> None:
+    """on_change do editor: mede o texto uma vez por alteração, não a cada rerun."""
+    texto = st.session_state.texto_digitado_input
+    st.session_state.char_count = len(texto)
+    st.session_state.line_count = texto.count("\n") + 1
+
 # Atualiza o editor somente quando muda a redação
 if st.session_state.loaded_redacao_id != dados["redacao_id"]:
     st.session_state.texto_digitado_input = dados["texto_digitado"] or ""
-    st.session_state.last_saved_text = dados["texto_digitado"] or ""
+    st.session_state.last_saved_hash = _digest(dados["texto_digitado"] or "")
     st.session_state.loaded_redacao_id = dados["redacao_id"]
+    atualizar_contagem()
 
 col_esq, col_dir = st.columns([1, 1])
 
@@ -582,18 +610,42 @@ col_esq, col_dir = st.columns([1, 1])
 with col_esq:
     st.markdown("#### Imagem da redação")
     if dados["imagem_url"]:
+        # Próxima/anterior da página: o navegador baixa a imagem enquanto o texto é revisado
+        # (a selecionada fica no cache: ao avançar, só a nova próxima é buscada)
+        janela = ids[max(0, idx_atual - 1): idx_atual + 2]
+        vizinhos = [ids[i] for i in (idx_atual + 1, idx_atual - 1) if 0 <= i < len(ids)]
+        try:
+            if any(rid not in st.session_state.imagens_cache for rid in janela):
+                with engine.connect() as conn:
+                    carregar_imagens(conn, janela)
+        except SQLAlchemyError:
+            pass  # pré-carregamento é só otimização
+        cache = st.session_state.imagens_cache
+        preload_urls = [u for u in (_safe_image_url(cache.get(rid)) for rid in vizinhos) if u]
         render_click_zoom(
             image_url=dados["imagem_url"],
             height_px=760,
             step=0.5,
             max_scale=4.0,
-            min_scale=1.0
+            min_scale=1.0,
+            preload=preload_urls,
         )
     else:
         st.warning("Nenhuma imagem associada a este redacao_id.")
 
 # --------- Direita: Editor + Status + Salvar ----------
-with col_dir:
+@st.fragment
+def editor_panel(dados: Dict[str, Any], ids: List[int]) -> None:
+    """
+    Editor em fragmento: digitar/Salvar reexecuta só este bloco (e os cards
+    do resumo), sem refazer as consultas de resumo/lista. Salvar e ir para o
+    próximo troca a seleção e por isso pede um rerun completo.
+    """
+    # Redesenha os cards em toda reexecução do fragmento: o que ele escreveu no
+    # placeholder e não reescrever na execução seguinte é removido pelo Streamlit.
+    # No rerun completo o corpo principal já os desenhou neste mesmo run.
+    if not st.session_state.pop("resumo_no_corpo", False):
+        render_resumo()
     st.markdown("#### Texto digitado (editável)")
     status_db = int(dados["status"])
     if status_db == 1:
@@ -604,42 +656,59 @@ with col_dir:
     st.text_area(
         "Edite abaixo e clique em Salvar",
         key="texto_digitado_input",
+        on_change=atualizar_contagem,
         height=520,
         help="O texto deve espelhar a redação exibida na imagem ao lado."
     )
 
     colf1, colf2 = st.columns([1,1])
     if colf1.button("💾 Salvar (marca como 'Atualizado')", use_container_width=True):
-        try:
-            curr_text = st.session_state.get("texto_digitado_input", "")
-            salvar_texto(engine, dados["redacao_id"], curr_text, dados["imagem_url"])
-            st.session_state.last_saved_text = curr_text
-            st.toast("Salvo com sucesso! Status atualizado para 'Atualizado'.", icon="✅")
-            st.rerun()  # garante atualização imediata de status/contadores
-        except SQLAlchemyError as e:
-            st.error("Erro ao salvar no banco de dados.")
-            st.exception(e)
+        curr_text = st.session_state.get("texto_digitado_input", "")
+        # Só grava se o texto mudou ou se ainda falta marcar como 'Atualizado'
+        curr_hash = _digest(curr_text)
+        if curr_hash == st.session_state.last_saved_hash and status_db == 1:
+            st.toast("Nada a salvar: o texto não mudou.", icon="ℹ️")
+        else:
+            try:
+                salvar_texto(engine, dados["redacao_id"], curr_text, dados["imagem_url"])
+                st.session_state.last_saved_hash = curr_hash
+                # `dados` (redacao_atual) é reaproveitado nos reruns: reflete o novo status
+                dados["status"] = 1
+                if status_db == 0:
+                    st.session_state.resumo["pendentes"] -= 1
+                    st.session_state.resumo["concluidos"] += 1
+                st.toast("Salvo com sucesso! Status atualizado para 'Atualizado'.", icon="✅")
+                st.rerun(scope="fragment")  # atualiza o badge sem reexecutar o app inteiro
+            except SQLAlchemyError as e:
+                st.error("Erro ao salvar no banco de dados.")
+                st.exception(e)
 
     if colf2.button("✅ Salvar e ir para o próximo", use_container_width=True):
         try:
             curr_text = st.session_state.get("texto_digitado_input", "")
-            salvar_texto(engine, dados["redacao_id"], curr_text, dados["imagem_url"])
-            st.session_state.last_saved_text = curr_text
-            # vai para o próximo
+            curr_hash = _digest(curr_text)
+            if curr_hash != st.session_state.last_saved_hash or status_db == 0:
+                salvar_texto(engine, dados["redacao_id"], curr_text, dados["imagem_url"])
+                st.session_state.last_saved_hash = curr_hash
+                # na última redação não há próxima e `dados` segue em uso no rerun
+                dados["status"] = 1
+            # vai para o próximo (mesmo que esteja na página seguinte)
             if st.session_state.selecionado in ids:
-                idx = ids.index(st.session_state.selecionado)
-                if idx < len(ids) - 1:
-                    st.session_state.selecionado = ids[idx + 1]
-                    st.session_state.loaded_redacao_id = None
+                ir_para_vizinha(proxima=True)
             st.rerun()
         except SQLAlchemyError as e:
             st.error("Erro ao salvar no banco de dados.")
             st.exception(e)
 
-    st.caption(
-        f"Caracteres: {len(st.session_state.texto_digitado_input)} • "
-        f"Linhas: {st.session_state.texto_digitado_input.count(chr(10)) + 1}"
-    )
+    # Contador opcional: evita percorrer o texto inteiro em todo rerun do editor
+    if st.toggle("Mostrar contador de caracteres", key="show_count"):
+        st.caption(
+            f"Caracteres: {st.session_state.char_count} • "
+            f"Linhas: {st.session_state.line_count}"
+        )
+
+with col_dir:
+    editor_panel(dados, ids)
 
 # Rodapé
 st.write("---")
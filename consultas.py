@@ -0,0 +1,112 @@
+# consultas.py
+# -*- coding: utf-8 -*-
+"""
+SQL do app (tudo em textos_digitados), compilado uma única vez.
+
+Fica fora do app.py porque o Streamlit reexecuta o script principal a cada
+rerun; módulos importados permanecem em sys.modules, então os TextClause
+abaixo são construídos uma vez por processo.
+
+Status NULL conta como pendente (0) em todas as consultas, para funcionar
+também antes de migrations/001_status_not_null_idx_status_rid.sql; a
+migração (status NOT NULL + índice (status, redacao_id)) é o que torna os
+filtros por status leituras de índice.
+"""
+
+from typing import Any, Dict, Tuple
+
+from sqlalchemy import bindparam, text
+
+# Modos de busca por redacao_id
+BUSCA_NENHUMA = ""
+BUSCA_ID = "id"        # só dígitos: igualdade na PK (index lookup)
+BUSCA_TEXTO = "texto"  # demais termos: LIKE sobre o id convertido (varre a tabela)
+
+def _where_sql(somente_pendentes: bool, busca_modo: str, *extras: str) -> str:
+    """Cláusula WHERE comum à listagem, contagem e navegação."""
+    where = list(extras)
+    if somente_pendentes:
+        # sem COALESCE: `= 0 OR IS NULL` continua usando idx_status_rid (ref_or_null)
+        where.append("(status = 0 OR status IS NULL)")
+    if busca_modo == BUSCA_ID:
+        where.append("redacao_id = :busca_id")
+    elif busca_modo == BUSCA_TEXTO:
+        where.append("CAST(redacao_id AS CHAR) LIKE :busca")
+    return (" WHERE " + " AND ".join(where)) if where else ""
+
+def filtro(somente_pendentes: bool, busca: str) -> Tuple[Tuple[bool, str], Dict[str, Any]]:
+    """Chave da variante pré-compilada + parâmetros de bind dos filtros."""
+    busca = (busca or "").strip()
+    if not busca:
+        return (bool(somente_pendentes), BUSCA_NENHUMA), {}
+    if busca.isascii() and busca.isdigit():  # isdigit() sozinho aceita "²", que int() rejeita
+        return (bool(somente_pendentes), BUSCA_ID), {"busca_id": int(busca)}
+    return (bool(somente_pendentes), BUSCA_TEXTO), {"busca": f"%{busca}%"}
+
+# As consultas com filtros têm uma variante por combinação
+# (somente_pendentes × modo de busca).
+_VARIANTES = [(p, b) for p in (False, True) for b in (BUSCA_NENHUMA, BUSCA_ID, BUSCA_TEXTO)]
+
+# Uma linha por status (lida direto de idx_status_rid); o total é somado no app
+Q_RESUMO = text("""
+    SELECT status, COUNT(*) AS n
+    FROM textos_digitados
+    GROUP BY status
+""")
+Q_CONTAR = {v: text("SELECT COUNT(*) FROM textos_digitados" + _where_sql(*v)) for v in _VARIANTES}
+# Listagem por keyset: a janela começa depois de :after (exclusivo) e o custo
+# não cresce com a posição na tabela, ao contrário de OFFSET. A 1ª janela
+# (sem :after) é a variante com_after=False.
+Q_LISTAR = {
+    (p, b, com_after): text(
+        "SELECT redacao_id, status FROM textos_digitados"
+        + _where_sql(p, b, *(["redacao_id > :after"] if com_after else []))
+        + " ORDER BY redacao_id ASC LIMIT :lim"
+    )
+    for p, b in _VARIANTES for com_after in (False, True)
+}
+# Vizinho seguinte/anterior a :rid; :off > 0 pula ids (início da janela anterior)
+Q_PROXIMA = {
+    v: text(
+        "SELECT redacao_id FROM textos_digitados"
+        + _where_sql(*v, "redacao_id > :rid") + " ORDER BY redacao_id ASC LIMIT 1 OFFSET :off"
+    )
+    for v in _VARIANTES
+}
+Q_ANTERIOR = {
+    v: text(
+        "SELECT redacao_id FROM textos_digitados"
+        + _where_sql(*v, "redacao_id < :rid") + " ORDER BY redacao_id DESC LIMIT 1 OFFSET :off"
+    )
+    for v in _VARIANTES
+}
+# Salto direto para uma página: único ponto com OFFSET (só quando o usuário digita a página)
+Q_SALTO = {
+    v: text(
+        "SELECT redacao_id FROM textos_digitados"
+        + _where_sql(*v) + " ORDER BY redacao_id ASC LIMIT 1 OFFSET :off"
+    )
+    for v in _VARIANTES
+}
+Q_LOAD = text("""
+    SELECT
+      redacao_id,
+      arquivo_nome_armazenamento AS imagem_url,
+      status,
+      COALESCE(texto_digitado,'') AS texto_digitado
+    FROM textos_digitados
+    WHERE redacao_id = :rid
+    LIMIT 1
+""")
+# Imagens das redações vizinhas em uma única ida ao banco (pré-carregamento)
+Q_IMAGENS = text("""
+    SELECT redacao_id, arquivo_nome_armazenamento AS imagem_url
+    FROM textos_digitados
+    WHERE redacao_id IN :rids
+""").bindparams(bindparam("rids", expanding=True))
+# Upsert em uma única instrução (requer redacao_id como PRIMARY KEY/UNIQUE)
+Q_UPSERT = text("""
+    INSERT INTO textos_digitados (redacao_id, texto_digitado, status, arquivo_nome_armazenamento)
+    VALUES (:rid, :txt, 1, :img)
+    ON DUPLICATE KEY UPDATE texto_digitado = VALUES(texto_digitado), status = 1
+""")
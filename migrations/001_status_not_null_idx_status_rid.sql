@@ -0,0 +1,14 @@
+-- textos_digitados: status NOT NULL + índice (status, redacao_id)
+--
+-- Com status anulável as consultas precisavam de COALESCE(status,0), que
+-- impede o uso de índice. Após esta migração, os filtros `status = 0` da
+-- listagem/contagem viram range scan em idx_status_rid e o resumo
+-- (COUNT/SUM por status) é respondido só pelo índice.
+
+UPDATE textos_digitados SET status = 0 WHERE status IS NULL;
+
+ALTER TABLE textos_digitados
+  MODIFY status TINYINT NOT NULL DEFAULT 0;
+
+ALTER TABLE textos_digitados
+  ADD INDEX idx_status_rid (status, redacao_id);